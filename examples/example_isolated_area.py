@@ -51,8 +51,12 @@ feature_names = [
     "Load",
     "Inertia"
 ]
-feature_values = pd.DataFrame(columns=feature_names, index=np.arange(islands))
+# The PowerFactory API is not thread safe, so the features are computed
+# sequentially into a preallocated array that is wrapped once at the end.
+feature_array = np.empty((int(islands), len(feature_names)), dtype=np.float64)
 for island in range(int(islands)):
-    for feature in feature_names: 
-        feature_values.loc[island, feature] = grid.get_init_value(feature, loads[island], machines[island])
-print(feature_values)
\ No newline at end of file
+    for idx, feature in enumerate(feature_names):
+        feature_array[island, idx] = grid.get_init_value(
+            feature, loads[island], machines[island])
+feature_values = pd.DataFrame(feature_array, columns=feature_names)
+print(feature_values)
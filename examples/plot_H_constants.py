@@ -2,17 +2,20 @@ import matplotlib2tikz
 import matplotlib.pyplot as plt
 import numpy as np
 
-t_cs = [0.2, 0.4, 0.7]
+t_cs = np.array([0.2, 0.4, 0.7])
 powers = np.arange(0, 1.1, 0.1)
 f_0 = 50
-dfs = [5, 10, 2, 1]
+dfs = np.array([5, 10, 2, 1])
 
-for df in dfs:
-    for t_c in t_cs:
-        H = [f_0*power*t_c/(2*df) for power in powers]
+# Inertia constants for all combinations of power, df and t_c.
+# The shape is (powers, dfs, t_cs)
+H = f_0*powers[:, None, None]*t_cs[None, None, :]/(2*dfs[None, :, None])
+H = H.reshape(len(powers), -1)
 
-        label = 'df= ' + str(df) + ',t_c=' + str(t_c)
-        plt.plot(powers, H, label=label)
+labels = ['df= ' + str(df) + ',t_c=' + str(t_c)
+          for df in dfs for t_c in t_cs]
+for idx, label in enumerate(labels):
+    plt.plot(powers, H[:, idx], label=label)
 
 plt.legend()
 plt.grid(True)
@@ -1,33 +1,35 @@
-import matplotlib2tikz
-import matplotlib.pyplot as plt
+import os
 import numpy as np
 
-powers = np.arange(0, 1.1, 0.1)
+# Set SINFACTORY_SHOW=0 to only write the data, e.g. on headless runs.
+SHOW_PLOT = os.environ.get("SINFACTORY_SHOW", "1") == "1"
+
 H_constants = np.arange(0.3, 1.4, 0.3)
 f_0 = 50
-dfs = [5, 10, 2, 1]
+dfs = np.array([5, 10, 2, 1])
 
 powers = np.linspace(0.01, 1)
-data = []
-for df in dfs:
-    for H in H_constants:
-        t = [2*H*df/(f_0*power) for power in powers]
+# Time to reach df for all combinations of power, df and H.
+# The shape is (powers, dfs, H_constants)
+t = 2*H_constants[None, None, :]*dfs[None, :, None]/(f_0*powers[:, None, None])
+t = t.reshape(len(powers), -1)
+
+data = np.column_stack((powers*100, t))
 
-        t = np.array(t).reshape(-1, 1)
-        powers = np.array(powers).reshape(-1, 1)
+np.savetxt("../plots/time_islanded.csv",
+           data, delimiter=',')
 
-        if not np.any(data):
-            data = np.concatenate((powers*100, t), 1)
-        else:
-            data = np.column_stack((data, t))
+if SHOW_PLOT:
+    import matplotlib2tikz
+    import matplotlib.pyplot as plt
 
-        label = 'df= ' + str(df) + ',H=' + str(H)
-        plt.plot(powers*100, t, label=label)
+    labels = ['df= ' + str(df) + ',H=' + str(H)
+              for df in dfs for H in H_constants]
+    for idx, label in enumerate(labels):
+        plt.plot(powers*100, t[:, idx], label=label)
 
-plt.legend()
-plt.grid(True)
+    plt.legend()
+    plt.grid(True)
 
-# matplotlib2tikz.save("../plots/time_islanded_template.tikz")
-np.savetxt("../plots/time_islanded.csv",
-           data, delimiter=',')
-plt.show()
+    # matplotlib2tikz.save("../plots/time_islanded_template.tikz")
+    plt.show()
@@ -2,6 +2,7 @@
 from sinfactory.bus import Bus
 from sinfactory.line import Line
 import itertools
+import numpy as np
 
 
 class Area(object):
@@ -11,13 +12,27 @@ class Area(object):
         """Constructor for Area class."""
         
         self.name = pf_object.GetFullName().split("\\")[-1].split(".")[0]
-        self.buses = {bus.cDisplayName: Bus(bus)
-                      for bus in pf_object.GetBuses()}
         self.pf_object = pf_object
+        self._build()
+
+    def _build(self):
+        """Collect the buses, lines and units of the area."""
+        self.buses = {bus.cDisplayName: Bus(bus) for bus in
+                      self.pf_object.GetBuses()}
 
         self.lines = {line.cDisplayName: Line(line) for line in
-                      pf_object.GetBranches() if "ElmLne" in
-                      line.GetFullName()}
+                      self.pf_object.GetBranches()
+                      if line.GetClassName() == "ElmLne"}
+
+        # GetAll traverses the whole area, so it is only done once.
+        self._all_set = frozenset(self.pf_object.GetAll())
+
+        # The units of each type in the area, built on request
+        self._elm_lists = {}
+
+    def refresh(self):
+        """Update the area after the topology has been changed."""
+        self._build()
 
     def get_inter_area_flow(self, area):
         """Get the flow between two areas.
@@ -37,25 +52,22 @@ class Area(object):
         Args:
             area: The other area to get the lines to.
         """
-        lines = {}
-        for line in itertools.chain(self.lines.values(),
-                                    area.lines.values()):
-            if (line.f_bus_cub in self.pf_object.GetAll() and
-                    line.t_bus_cub in area.pf_object.GetAll()):
-                lines[line.name] = line
-            if (line.t_bus_cub in self.pf_object.GetAll() and
-                    line.f_bus_cub in area.pf_object.GetAll()):
-                lines[line.name] = line
-
-        return lines
+        self_all = self._all_set
+        area_all = area._all_set
+
+        return {line.name: line for line in
+                itertools.chain(self.lines.values(), area.lines.values())
+                if (line.f_bus_cub in self_all and line.t_bus_cub in area_all)
+                or (line.t_bus_cub in self_all and line.f_bus_cub in area_all)}
 
     def get_total_var(self, var):
         """Return the total var in area."""
-        tot = 0
-        for bus in self.buses.values():
-            for elm in getattr(bus, var).values():
-                tot += elm.p_set
-        return tot
+        if var not in self._elm_lists:
+            self._elm_lists[var] = [elm for bus in self.buses.values()
+                                    for elm in getattr(bus, var).values()]
+        elms = self._elm_lists[var]
+        return np.fromiter((elm.p_set for elm in elms), dtype=np.float64,
+                           count=len(elms)).sum()
 
 
 
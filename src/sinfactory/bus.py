@@ -1,5 +1,6 @@
 """Module for handling buses."""
 
+from functools import cached_property
 from sinfactory.component import Component
 from sinfactory.load import Load
 from sinfactory.generator import Generator
@@ -15,23 +16,39 @@ class Bus(Component):
             pf_object: The power factory object we will store.
         """
         super().__init__(pf_object)
-        elms = pf_object.GetConnectedElements()
-
-        self.loads = {}
-        self.gens = {}
-
-        # If this makes initialisation too slow, only calculate this on
-        # request.
-        for elm in elms:
-            elm_name = elm.GetFullName()
-            if "ElmLod" in elm_name:
-                self.loads[elm.cDisplayName] = Load(elm)
-            if "ElmSym" in elm_name:
-                self.gens[elm.cDisplayName] = Generator(elm)
-
-        self.cubs = []
-        for elm in pf_object.GetConnectedCubicles():
-            self.cubs.append(elm)
+
+    @cached_property
+    def cubs(self):
+        """The cubicles connected to the bus."""
+        return list(self.pf_object.GetConnectedCubicles())
+
+    @cached_property
+    def _elms_by_class(self):
+        """The connected elements grouped by class.
+
+        The connected elements are only read once, and their class only
+        asked for once, for both loads and gens."""
+        elms = {}
+        for elm in self.pf_object.GetConnectedElements():
+            elms.setdefault(elm.GetClassName(), []).append(elm)
+        return elms
+
+    @cached_property
+    def loads(self):
+        """The loads connected to the bus.
+
+        The load objects are only created the first time they are needed."""
+        return {elm.cDisplayName: Load(elm) for elm in
+                self._elms_by_class.get("ElmLod", [])}
+
+    @cached_property
+    def gens(self):
+        """The generators connected to the bus.
+
+        The generator objects are only created the first time they are
+        needed."""
+        return {elm.cDisplayName: Generator(elm) for elm in
+                self._elms_by_class.get("ElmSym", [])}
 
     @property
     def u(self):
@@ -0,0 +1,43 @@
+"""Module for handling dynamic simulation results."""
+import numpy as np
+
+
+def freq_metrics(time, freq, tol=0.01):
+    """Calculate the frequency metrics of several time series at once.
+
+    All columns are handled by the same array operations, so there is no
+    Python loop over the machines.
+
+    Args:
+        time: Array with the simulation time.
+        freq: 2-D array with one frequency time series in each column.
+        tol: Band around the final value that counts as settled.
+
+    Returns:
+        nadir: The minimum frequency of each column.
+        rocof: The largest absolute rate of change of frequency of each
+            column.
+        settling_time: The time after which each column stays within tol
+            of its final value.
+    """
+    time = np.asarray(time, dtype=np.float64)
+    freq = np.asarray(freq, dtype=np.float64)
+    if freq.ndim == 1:
+        freq = freq[:, None]
+
+    nadir = freq.min(axis=0)
+    # Result files repeat the time stamp at discrete events. Only the last
+    # sample of each time stamp is used for the derivative, so that the
+    # time step is never zero.
+    keep = np.append(np.diff(time) > 0, True)
+    rocof = np.abs(np.gradient(freq[keep], time[keep], axis=0)).max(axis=0)
+
+    # The last sample outside the band, found by searching the reversed
+    # series for the first sample outside it
+    outside = np.abs(freq - freq[-1]) > tol
+    last_outside = len(time) - 1 - outside[::-1].argmax(axis=0)
+    settled_idx = np.where(outside.any(axis=0),
+                           np.minimum(last_outside + 1, len(time) - 1), 0)
+    settling_time = time[settled_idx]
+
+    return nadir, rocof, settling_time
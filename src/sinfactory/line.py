@@ -1,4 +1,5 @@
 """Module for handling lines in PowerFactory."""
+from functools import cached_property
 from sinfactory.component import Component
 
 
@@ -13,12 +14,32 @@ class Line(Component):
         """
         super().__init__(pf_object)
 
-        self.f_bus_cub = self.pf_object.bus1
-        self.t_bus_cub = self.pf_object.bus2
-        self.f_bus = pf_object.bus1.GetFullName().split("\\")[-2].split(".")[0]
-        self.t_bus = pf_object.bus2.GetFullName().split("\\")[-2].split(".")[0]
-        self.switches = [self.pf_object.bus1.cpCB,
-                         self.pf_object.bus2.cpCB]
+    # The connections are only read from powerfactory when needed
+    @cached_property
+    def f_bus_cub(self):
+        """The cubicle at the from end of the line."""
+        return self.pf_object.bus1
+
+    @cached_property
+    def t_bus_cub(self):
+        """The cubicle at the to end of the line."""
+        return self.pf_object.bus2
+
+    @cached_property
+    def f_bus(self):
+        """The name of the from bus."""
+        # The parent of a cubicle is the bus it is connected to
+        return self.f_bus_cub.fold_id.loc_name
+
+    @cached_property
+    def t_bus(self):
+        """The name of the to bus."""
+        return self.t_bus_cub.fold_id.loc_name
+
+    @cached_property
+    def switches(self):
+        """The breakers at both ends of the line."""
+        return [self.f_bus_cub.cpCB, self.t_bus_cub.cpCB]
 
     @property
     def loading(self):
@@ -1,7 +1,13 @@
 """Module for interfacing with power factory."""
 
 import os
+import re
+import csv
+import fnmatch
+import functools
+import hashlib
 import itertools
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import pandas as pd
 import powerfactory as pf
@@ -10,9 +16,76 @@ from sinfactory.generator import Generator
 from sinfactory.load import Load
 from sinfactory.area import Area
 from sinfactory.bus import Bus
+from sinfactory.component import Component
 from sinfactory.eigenresults import EigenValueResults
+from sinfactory.dynresults import freq_metrics
 from sinfactory.pfresults import PFResults
 
+# Matches the short name of an exported variable label, e.g. u in
+# m:u in p.u. or P in m:P:bus1 in MW
+_VARIABLE_NAME_RE = re.compile(r"^[^:]*:((?:(?! in )[^:])*)")
+
+
+@functools.lru_cache(maxsize=16)
+def _short_variable_names(labels):
+    """Map exported variable labels, e.g. m:u in p.u., to short names, u.
+
+    The same variables are usually exported many times, so the mapping
+    is cached on the tuple of labels.
+    """
+    match = _VARIABLE_NAME_RE.match
+    return {i: match(i).group(1) for i in labels}
+
+
+# The settings of each event class that change the simulation results, see
+# PFactoryGrid._sim_cache_key
+_EVENT_KEY_ATTRS = {
+    "EvtShc": ("outserv", "i_shc", "R_f", "X_f"),
+    "EvtSwitch": ("outserv", "i_switch", "i_allph"),
+}
+
+
+# The grid of a worker process in PFactoryGrid.run_batch, together with
+# the study case and the load powers it started with
+_batch_grid = None
+_batch_case = None
+_batch_loads = None
+
+
+def _init_batch_worker(project_name):
+    """Start powerfactory in a worker process of run_batch."""
+    global _batch_grid, _batch_case, _batch_loads
+    _batch_grid = PFactoryGrid(project_name)
+    _batch_case = _batch_grid.app.GetActiveStudyCase().loc_name
+    _batch_loads = ({name: load.p_set
+                     for name, load in _batch_grid.loads.items()},
+                    {name: load.q_set
+                     for name, load in _batch_grid.loads.items()})
+
+
+def _run_batch_scenario(scenario):
+    """Run one scenario of run_batch in a worker process.
+
+    The worker is set back to the study case and load powers it started
+    with afterwards, so a scenario does not depend on which scenarios
+    the worker ran before it.
+    """
+    try:
+        if scenario.get("study_case"):
+            _batch_grid.activate_study_case(scenario["study_case"])
+        if scenario.get("p_load"):
+            _batch_grid.set_load_powers(scenario["p_load"],
+                                        scenario.get("q_load"))
+        _batch_grid.prepare_dynamic_sim(variables=scenario["variables"],
+                                        **scenario.get("sim_cfg", {}))
+        _batch_grid.run_dynamic_sim()
+        return _batch_grid.get_results(scenario["variables"])
+    finally:
+        if scenario.get("p_load"):
+            _batch_grid.set_load_powers(*_batch_loads)
+        if scenario.get("study_case"):
+            _batch_grid.activate_study_case(_batch_case)
+
 
 class PFactoryGrid(object):
     """Class for interfacing with powerfactory."""
@@ -28,6 +101,7 @@ class PFactoryGrid(object):
             raise RuntimeError("Failed to load powerfactory.")
 
         # Activate project.
+        self.project_name = project_name
         self.project = self.app.ActivateProject(project_name)
 
         if self.project is None:
@@ -36,21 +110,24 @@ class PFactoryGrid(object):
         # Get the output window
         self.window = self.app.GetOutputWindow()
 
+        # Objects of the active study case, see _from_study_case
+        self._case_objs = {}
+
         # Get the load flow object
-        self.ldf = self.app.GetFromStudyCase("ComLdf")
-        
-        self.lines = {line.cDisplayName: Line(line) for line in
-                      self.app.GetCalcRelevantObjects("*.ElmLne")}
+        self.ldf = self._from_study_case("ComLdf")
+
+        # Cache of calculation relevant objects, see _relevant
+        self._obj_cache = {}
 
         self.gens = {gen.cDisplayName: Generator(gen) for gen in
-                     self.app.GetCalcRelevantObjects("*.ElmSym")}
+                     self._relevant("*.ElmSym")}
         
         self.loads = {load.cDisplayName: Load(load) for load in
-                      self.app.GetCalcRelevantObjects("*.ElmLod")}
+                      self._relevant("*.ElmLod")}
         
         self.areas = {area.GetFullName(
         ).split("\\")[-1].split(".")[0]: Area(area)
-                      for area in self.app.GetCalcRelevantObjects("*.ElmArea")}
+                      for area in self._relevant("*.ElmArea")}
 
         # The powerfactory caclulation of inter area flows can be a bit
         # sketchy. Here I create objects of inter area lines that keep track
@@ -75,7 +152,28 @@ class PFactoryGrid(object):
                                                      areas[1])
 
         self.buses = {bus.cDisplayName: Bus(bus) for bus in
-                      self.app.GetCalcRelevantObjects("*.ElmTerm")}
+                      self._relevant("*.ElmTerm")}
+
+        # The monitored elements of the dynamic simulation and the
+        # columns of previous exports, see write_results_to_file
+        self._monitored = {}
+        self._monitor_plan = []
+        self._export_columns = {}
+        self._export_key = None
+        self._registered = None
+
+        # Cache of the full names of objects, see _full_name
+        self._full_name_cache = {}
+
+        # The number of rows of the loaded result file, see _load_results
+        self._res_rows = None
+
+    # The lines are only wrapped when they are needed
+    @functools.cached_property
+    def lines(self):
+        """The lines of the grid keyed by name."""
+        return {line.cDisplayName: Line(line) for line in
+                self._relevant("*.ElmLne")}
 
     def activate_study_case(self, study_case_name, folder_name=""):
         """Activate study case."""
@@ -83,6 +181,74 @@ class PFactoryGrid(object):
         study_case_file = study_case_name + ".IntCase"
         self.study_case = study_case_folder.GetContents(study_case_file)[0]
         self.study_case.Activate()
+        self._obj_cache.clear()
+        self._full_name_cache.clear()
+        self._export_columns = {}
+        self._case_objs.clear()
+        self.ldf = self._from_study_case("ComLdf")
+
+    def _from_study_case(self, name):
+        """Return an object of the active study case.
+
+        The objects are cached, so that powerfactory is only asked once per
+        study case.
+
+        Args:
+            name: Name of the object, e.g. ComLdf
+        """
+        obj = self._case_objs.get(name)
+        if obj is None:
+            obj = self.app.GetFromStudyCase(name)
+            self._case_objs[name] = obj
+        return obj
+
+    def _relevant(self, pattern):
+        """Return the calculation relevant objects matching pattern.
+
+        The objects are cached, so that the grid is only searched once per
+        pattern and study case. Elements that are out of service are
+        included, so changing the service status of an element does not
+        invalidate the cache. It is only cleared when another study case
+        is activated.
+
+        Args:
+            pattern: Name of the objects including class, e.g. *.ElmSym
+        """
+        objs = self._obj_cache.get(pattern)
+        if objs is None:
+            objs = self.app.GetCalcRelevantObjects(pattern)
+            self._obj_cache[pattern] = objs
+        return objs
+
+    def _by_name(self, cls):
+        """Return the calculation relevant objects of a class by name.
+
+        Args:
+            cls: The class of the objects, e.g. ElmSym
+        """
+        key = ("by_name", cls)
+        index = self._obj_cache.get(key)
+        if index is None:
+            index = {}
+            for obj in self._relevant("*." + cls):
+                index.setdefault(obj.loc_name, obj)
+            self._obj_cache[key] = index
+        return index
+
+    def _get_one(self, name):
+        """Return the first calculation relevant object matching name.
+
+        Args:
+            name: Name of the object including class, e.g. SM1.ElmSym
+        """
+        loc_name, _, cls = name.rpartition(".")
+        # Plain names are looked up among all objects of the class, so that
+        # the grid is searched once per class instead of once per name
+        if loc_name and not any(c in name for c in "*?[\\"):
+            obj = self._by_name(cls).get(loc_name)
+            if obj is not None:
+                return obj
+        return self._relevant(name)[0]
 
     def prepare_dynamic_sim(
         self,
@@ -117,26 +283,25 @@ class PFactoryGrid(object):
         self.variables = variables
 
         # Get result file.
-        self.res = self.app.GetFromStudyCase("*.ElmRes")
-        # Select result variable to monitor.
-        for elm_name, var_names in variables.items():
-            # Get all elements that match elm_name
-            elements = self.app.GetCalcRelevantObjects(elm_name)
-            # Select variables to monitor for each element
-            for element in elements:
-                self.res.AddVars(element, *var_names)
+        self.res = self._from_study_case("*.ElmRes")
+        self._res_rows = None
+        # The variables only have to be added to the result file once as
+        # long as neither they nor the result file change
+        registered = (self.res, tuple((elm_name, tuple(var_names))
+                                      for elm_name, var_names
+                                      in variables.items()))
+        if registered != self._registered:
+            self._monitor_variables(variables)
+            self._registered = registered
 
         # Retrieve initial conditions and time domain simulation object
-        self.inc = self.app.GetFromStudyCase("ComInc")
-        self.sim = self.app.GetFromStudyCase("ComSim")
+        self.inc = self._from_study_case("ComInc")
+        self.sim = self._from_study_case("ComSim")
 
         # Set simulation type
         self.inc.iopt_sim = sim_type
 
-        # Set time options
-        self.inc.tstart = start_time
-        self.inc.dtgrid = step_size
-        self.sim.tstop = end_time
+        self.set_sim_window(start_time, end_time, step_size)
 
         # Verify initial conditions
         self.inc.iopt_show = True
@@ -146,6 +311,86 @@ class PFactoryGrid(object):
 
         return self.inc.ZeroDerivative()
 
+    def set_sim_window(self, start_time=0.0, end_time=10.0, step_size=0.01):
+        """Set the time options of the dynamic simulation.
+
+        Args:
+            start_time (float): The starting time for the simulation.
+            end_time (float): The end time for the simulation.
+            step_size (float): The time step used for the simulation.
+        """
+        self.inc.tstart = start_time
+        self.inc.dtgrid = step_size
+        self.sim.tstop = end_time
+
+    def _monitor_variables(self, variables):
+        """Add the variables to monitor to the result file.
+
+        Args:
+            variables (Dict): maps element names to lists of variables.
+        """
+        self._monitored = {}
+        self._export_columns = {}
+        resolved = self._resolve_elements(variables.keys())
+        add_vars = self.res.AddVars
+        # Each variable is only stored once in the result file
+        variables = {elm_name: tuple(dict.fromkeys(var_names))
+                     for elm_name, var_names in variables.items()}
+        for elm_name, var_names in variables.items():
+            # Get all elements that match elm_name
+            elements = resolved[elm_name]
+            # Select variables to monitor for each element
+            for element in elements:
+                add_vars(element, *var_names)
+            # Keep the elements so that the results can be read without
+            # searching for them again
+            self._monitored[elm_name] = elements
+
+        # The (element, variable) pairs of the result file
+        self._monitor_plan = [(element, var)
+                              for elm_name, var_names in variables.items()
+                              for element in self._monitored[elm_name]
+                              for var in var_names]
+
+    def _resolve_elements(self, elm_names):
+        """Find the calculation relevant objects for several names.
+
+        Names of the same class are resolved with one search for all
+        objects of that class, which are then matched on their names.
+
+        Args:
+            elm_names: Names of the elements including class, e.g.
+                SM1.ElmSym. Wildcards are allowed in the name.
+
+        Returns:
+            Dictionary mapping each name to a list of matching objects.
+        """
+        by_class = {}
+        for elm_name in elm_names:
+            name, _, cls = elm_name.rpartition(".")
+            by_class.setdefault(cls, []).append((elm_name, name))
+
+        resolved = {}
+        for cls, names in by_class.items():
+            if "*" in cls or not cls:
+                for elm_name, _ in names:
+                    resolved[elm_name] = self._relevant(elm_name)
+                continue
+            objs = [(obj.loc_name, obj) for obj in
+                    self._relevant("*." + cls)]
+            # Plain names are looked up directly, only wildcards and names
+            # that differ in case have to be matched against every object
+            by_loc_name = {}
+            for loc_name, obj in objs:
+                by_loc_name.setdefault(loc_name, []).append(obj)
+            for elm_name, name in names:
+                matches = by_loc_name.get(name)
+                if matches is None or any(c in name for c in "*?["):
+                    matches = [obj for loc_name, obj in objs
+                               if fnmatch.fnmatch(loc_name, name)]
+                resolved[elm_name] = matches
+        return resolved
+
     def initialize_and_run_dynamic_sim(
         self,
         var_machines=("m:u:bus1", "m:P:bus1", "s:outofstep", "s:firel"),
@@ -153,7 +398,8 @@ class PFactoryGrid(object):
         var_lines=("m:u:bus1", "c:loading"),
         var_buses=("m:u", "b:ipat"),
         sim_time=10.0,
-        sim_type='rms'
+        sim_type='rms',
+        cache_dir=None
     ):
         """ Initialize and run dynamic simulation.
             Saving result file as attribute. 
@@ -161,6 +407,12 @@ class PFactoryGrid(object):
         Args:
             var_names: Variables to track. 
             sim_type: Type of dynamic simulation - 'rms' or 'emt'
+            cache_dir: Optional directory where the results are stored.
+                A later call with the same study case, events, variables
+                and simulation time reads the results from there instead
+                of simulating. Only use it when the grid itself is not
+                changed between the calls. On a cache hit only
+                self.result is updated.
         """
         variables = self.generate_variables(
             var_machines=var_machines,
@@ -168,12 +420,115 @@ class PFactoryGrid(object):
             var_lines=var_lines,
             var_buses=var_buses,
         )
+        if cache_dir is not None:
+            cache_file = os.path.join(
+                cache_dir, self._sim_cache_key(variables, sim_time, sim_type)
+                + ".pkl")
+            if os.path.exists(cache_file):
+                # Only the results are restored, the monitored variables
+                # and the result file in powerfactory are left as they are
+                self.result = pd.read_pickle(cache_file)
+                return
+
         self.prepare_dynamic_sim(sim_type=sim_type,
                                  variables=variables,
                                  end_time=sim_time)
         self.run_dynamic_sim()
         self.result = self.get_results(variables=variables)
 
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            self.result.to_pickle(cache_file)
+
+    def _sim_cache_key(self, variables, sim_time, sim_type):
+        """Return a key for the results of a dynamic simulation.
+
+        The key depends on the active study case, the events with their
+        targets and settings, and the simulation settings.
+        """
+        events = []
+        for evt in self._get_event_folder().GetContents():
+            evt_class = evt.GetClassName()
+            target = getattr(evt, "p_target", None)
+            events.append((
+                evt.loc_name, evt_class, evt.time,
+                self._full_name(target) if target is not None else None,
+                tuple(getattr(evt, attr, None)
+                      for attr in _EVENT_KEY_ATTRS.get(evt_class, ()))))
+        settings = (self.project_name,
+                    self.app.GetActiveStudyCase().loc_name,
+                    sorted(events), sorted((elm_name, tuple(var_names))
+                                           for elm_name, var_names
+                                           in variables.items()),
+                    sim_time, sim_type)
+        return hashlib.blake2b(repr(settings).encode(),
+                               digest_size=16).hexdigest()
+
+    def simulate_and_collect(self, start_time, end_time, variables,
+                             branches=(), sim_type="rms", step_size=0.01):
+        """Prepare and run a dynamic simulation and read all results.
+
+        The active power flow of the branches is added to the monitored
+        variables, so that everything is read from the result file in
+        one pass.
+
+        Args:
+            start_time (float): The starting time for the simulation.
+            end_time (float): The end time for the simulation.
+            variables  (dict):     maps pf-object to list of variables.
+            branches: Names of lines to get the active power flow for.
+            sim_type (str): The simulation type, rms or ins.
+            step_size (float): The time step used for the simulation.
+
+        Returns:
+            dataframe: two-level dataframe with simulation results
+        """
+        variables = dict(variables)
+        for branch in branches:
+            var_names = list(variables.get(branch + ".ElmLne", []))
+            if "m:P:bus1" not in var_names:
+                var_names.append("m:P:bus1")
+            variables[branch + ".ElmLne"] = var_names
+
+        self.prepare_dynamic_sim(sim_type=sim_type,
+                                 variables=variables,
+                                 start_time=start_time,
+                                 step_size=step_size,
+                                 end_time=end_time)
+        self.run_dynamic_sim()
+
+        return self.get_all_dynamic_results(variables)
+
+    def run_batch(self, scenarios, max_workers=None):
+        """Run independent dynamic simulations in parallel.
+
+        Each worker process starts its own powerfactory instance with the
+        same project, since a powerfactory instance can only run one
+        simulation at a time. Note that each worker needs a licence. The
+        study case and load powers of a worker are restored after each
+        scenario, so the scenarios do not affect each other.
+
+        Args:
+            scenarios: List of dictionaries with the keys
+                variables: The variables to monitor, see
+                    prepare_dynamic_sim.
+                study_case (optional): Study case to activate.
+                p_load, q_load (optional): Load powers, see
+                    set_load_powers. q_load is only used together
+                    with p_load.
+                sim_cfg (optional): Keyword arguments to
+                    prepare_dynamic_sim.
+            max_workers: The number of worker processes. The default is
+                the number of processors.
+
+        Returns:
+            List with the results of each scenario, see get_results.
+        """
+        with ProcessPoolExecutor(max_workers=max_workers,
+                                 initializer=_init_batch_worker,
+                                 initargs=(self.project_name,)) as executor:
+            return list(executor.map(_run_batch_scenario, scenarios))
+
     def run_dynamic_sim(self):
         """Run dynamic simulation.
 
@@ -181,8 +536,45 @@ class PFactoryGrid(object):
             bool: False for success, True otherwise.
         """
 
+        # The result file has to be loaded again after the simulation
+        self._res_rows = None
         return bool(self.sim.Execute())
 
+    def _load_results(self):
+        """Load the result file of the dynamic simulation for reading.
+
+        The file is only loaded once after each simulation.
+
+        Returns:
+            int: The number of rows in the result file.
+        """
+        if self._res_rows is None:
+            self.res.Load()
+            self._res_rows = self.res.GetNumberOfRows()
+        return self._res_rows
+
+    def _full_name(self, element):
+        """Return the full name of a powerfactory object.
+
+        The names are cached so that repeated exports do not have to ask
+        powerfactory for them again.
+        """
+        full_name = self._full_name_cache.get(element)
+        if full_name is None:
+            full_name = element.GetFullName()
+            self._full_name_cache[element] = full_name
+        return full_name
+
+    def _get_elements(self, elm_name):
+        """Return the elements matching elm_name.
+
+        The elements resolved in prepare_dynamic_sim are reused if
+        elm_name was monitored there.
+        """
+        if elm_name in self._monitored:
+            return self._monitored[elm_name]
+        return self._resolve_elements([elm_name])[elm_name]
+
     def write_results_to_file(self, variables, filepath):
         """ Writes results to csv-file.
 
@@ -191,63 +583,88 @@ class PFactoryGrid(object):
             filepath (string):  filename for the temporary csv-file
         """
 
-        self.ComRes = self.app.GetFromStudyCase("ComRes")
-        self.ComRes.head = []  # Header of the file
-        self.ComRes.col_Sep = ","  # Column separator
-        self.ComRes.dec_Sep = "."  # Decimal separator
-        self.ComRes.iopt_exp = 6  # Export type (csv)
-        self.ComRes.iopt_csel = 1  # Export only user defined vars
-        self.ComRes.ciopt_head = 1  # Use parameter names for variables
-        self.ComRes.iopt_sep = 0  # Don't use system separators
-
-        self.ComRes.f_name = filepath
-        # Adding time as first column
-        resultobj = [self.res]
-        elements = [self.res]
-        cvariable = ["b:tnow"]
-        self.ComRes.head = []
-        # Defining all other results
-        for elm_name, var_names in variables.items():
-            for element in self.app.GetCalcRelevantObjects(elm_name):
-                full_name = element.GetFullName()
-                split_name = full_name.split("\\")
-                full_name_reduced = []
-                for dir in split_name[:-1]:
-                    full_name_reduced.append(dir.split(".")[0])
-                full_name_reduced.append(split_name[-1])
-                full_name_reduced = "\\".join(full_name_reduced)
-                if not ((elm_name in full_name) or (elm_name in full_name_reduced)):
-                    continue
-                for variable in var_names:
-                    self.ComRes.head.append(elm_name + "\\" + variable)
-                    elements.append(element)
-                    cvariable.append(variable)
-                    resultobj.append(self.res)
-        self.ComRes.variable = cvariable
-        self.ComRes.resultobj = resultobj
-        self.ComRes.element = elements
+        com_res = self._from_study_case("ComRes")
+        if com_res is not getattr(self, "ComRes", None):
+            # The export options are the same for every export, so they
+            # are only set once on each ComRes.
+            com_res.head = []  # Header of the file
+            com_res.col_Sep = ","  # Column separator
+            com_res.dec_Sep = "."  # Decimal separator
+            com_res.iopt_exp = 6  # Export type (csv)
+            com_res.iopt_csel = 1  # Export only user defined vars
+            com_res.ciopt_head = 1  # Use parameter names for variables
+            com_res.iopt_sep = 0  # Don't use system separators
+            self.ComRes = com_res
+            self._export_key = None
+
+        com_res.f_name = filepath
+        # The columns only depend on the variables, so they are reused
+        # when the same variables are exported again.
+        key = tuple((k, tuple(v)) for k, v in variables.items())
+        if key not in self._export_columns:
+            # Adding time as first column, followed by all other results
+            rows = [(self.res, "b:tnow")]
+            rows.extend(self._get_monitored_columns(variables))
+            elements, cvariable = map(list, zip(*rows))
+            self._export_columns[key] = (elements, cvariable,
+                                         [self.res]*len(rows))
+            self._export_key = None
+        # The column lists are only sent to powerfactory when they differ
+        # from those of the previous export
+        if key != self._export_key:
+            elements, cvariable, resultobj = self._export_columns[key]
+            com_res.variable = cvariable
+            com_res.resultobj = resultobj
+            com_res.element = elements
+            self._export_key = key
 
         self.ComRes.ExportFullRange()
 
-    def get_results(self, variables=None, filepath="results.csv"):
-        """ Writes simulation results to csv-file and re-import to dataframe.
+    def get_results(self, variables=None, filepath=None):
+        """ Return the simulation results as a dataframe.
+
+        The results are read directly from the result file in powerfactory.
+        If a filepath is given the results are instead written to a
+        csv-file, which is kept, and re-imported to a dataframe.
 
         Args:
             variables  (dict):     maps pf-object to list of variables.
-            filepath (string):  filename for the temporary csv-file
+            filepath (string):  filename for an optional csv-file
 
         Returns:
             dataframe: two-level dataframe with simulation results
         """
         if not variables and hasattr(self, "variables"):
             variables = self.variables
+
+        if filepath is None:
+            return self.get_all_dynamic_results(variables)
+
         self.write_results_to_file(variables, filepath)
+        return self.read_results_file(filepath)
 
-        res = pd.read_csv(filepath, sep=",", decimal=".", header=[0, 1], index_col=0)
-        # res.dropna(how='any')
-        res = res.apply(pd.to_numeric, errors="coerce").astype(float)
+    @staticmethod
+    def read_results_file(filepath, chunk_size=65536):
+        """ Read a csv-file written by write_results_to_file.
+
+        Args:
+            filepath (string):  filename of the csv-file
+            chunk_size (int):   number of rows parsed at a time
+
+        Returns:
+            dataframe: two-level dataframe with simulation results
+        """
+        # All columns are numbers, so let the C parser convert them directly
+        # instead of going through object columns and pd.to_numeric.
+        # Parsing in chunks bounds the size of the parser buffers, the
+        # full frame is still built in memory.
+        reader = pd.read_csv(filepath, sep=",", decimal=".", header=[0, 1],
+                             index_col=0, engine="c", dtype=np.float64,
+                             float_precision="high", chunksize=chunk_size)
+        with reader:
+            res = pd.concat(reader)
         res.rename(
-            {i: i.split(":")[1].split(" in ")[0] for i in res.columns.levels[1]},
+            _short_variable_names(tuple(res.columns.levels[1])),
             axis=1,
             level=1,
             inplace=True,
@@ -257,6 +674,294 @@ class PFactoryGrid(object):
 
         return res
 
+    @staticmethod
+    def read_results_file_numeric(filepath):
+        """ Read a csv-file written by write_results_to_file into arrays.
+
+        This skips building a dataframe, for when only the numbers are
+        needed.
+
+        Args:
+            filepath (string):  filename of the csv-file
+
+        Returns:
+            time: Array with the simulation time.
+            values: 2-D array with one column per exported variable.
+        """
+        # The two first rows are the header
+        res = np.loadtxt(filepath, delimiter=",", skiprows=2, ndmin=2)
+        return res[:, 0], res[:, 1:]
+
+    def _get_monitored_columns(self, variables=None):
+        """Return the (element, variable) pairs to read from the results.
+
+        Args:
+            variables  (dict):     maps pf-object to list of variables.
+        """
+        if not variables or variables is getattr(self, "variables", None):
+            return self._monitor_plan
+
+        columns = []
+        for elm_name, var_names in variables.items():
+            for element in self._get_elements(elm_name):
+                for var in var_names:
+                    columns.append((element, var))
+        return columns
+
+    @staticmethod
+    def _get_result_header(columns):
+        """Return the two-level column index for the result columns."""
+        return pd.MultiIndex.from_tuples(
+            [(element.loc_name, var.split(":")[1])
+             for element, var in columns],
+            names=("unit", "variable"))
+
+    def _read_result_rows(self, col_idx, start, stop):
+        """Read a range of rows from the loaded result file.
+
+        Args:
+            col_idx: The column indices in the result file to read.
+            start: The first row to read.
+            stop: The row to stop before.
+
+        Returns:
+            time: Array with the simulation time.
+            values: 2-D array with one column for each entry in col_idx.
+        """
+        get_value = self.res.GetValue
+        rows = range(start, stop)
+
+        time = np.fromiter((get_value(i, -1)[1] for i in rows),
+                           dtype=np.float64, count=len(rows))
+        # Column major, so that each column is written contiguously
+        values = np.empty((len(rows), len(col_idx)), order="F")
+        for j, col in enumerate(col_idx):
+            values[:, j] = np.fromiter((get_value(i, col)[1] for i in rows),
+                                       dtype=np.float64, count=len(rows))
+
+        return time, values
+
+    def _read_result_column(self, col, t_steps, out=None):
+        """Read a full column from the loaded result file.
+
+        Only available in powerfactory versions with ElmRes.GetColumnValues.
+        Like GetValue it returns the error code together with the values.
+
+        Args:
+            col: The column index in the result file, -1 for time.
+            t_steps: The number of rows in the result file.
+            out: Optional array of length t_steps to write the column to.
+        """
+        if out is None:
+            return np.fromiter(self.res.GetColumnValues(col)[1],
+                               dtype=np.float64, count=t_steps)
+        out[:] = self.res.GetColumnValues(col)[1]
+        return out
+
+    def _get_buffer(self, attr, size):
+        """Return a view of size elements of a reusable array.
+
+        The array is stored in attr and only reallocated when it is too
+        small.
+        """
+        buf = getattr(self, attr, None)
+        if buf is None or buf.size < size:
+            buf = np.empty(size)
+            setattr(self, attr, buf)
+        return buf[:size]
+
+    def _find_column(self, element, var_name):
+        """Return the index of a column in the result file.
+
+        FindColumn returns -1 for a missing column, which is also the
+        index of the time column, so a missing column is raised here
+        instead of silently returning the time.
+
+        Raises:
+            KeyError: If the variable of the element is not in the result
+                file.
+        """
+        col = self.res.FindColumn(element, var_name)
+        if col < 0:
+            raise KeyError(f"{var_name} of {self._full_name(element)} is "
+                           "not in the result file")
+        return col
+
+    def _get_result_columns(self, columns):
+        """Read columns from the result file of the dynamic simulation.
+
+        The result file is only loaded once for all the columns.
+
+        Args:
+            columns: List of (element, variable) tuples, where element is
+                a powerfactory object.
+
+        Returns:
+            time: Array with the simulation time.
+            values: 2-D array with one column for each entry in columns.
+
+        Raises:
+            KeyError: If one of the columns is not in the result file.
+        """
+        t_steps = self._load_results()
+        col_idx = [self._find_column(element, var)
+                   for element, var in columns]
+
+        if getattr(self.res, "GetColumnValues", None) is None:
+            return self._read_result_rows(col_idx, 0, t_steps)
+
+        time = self._read_result_column(-1, t_steps)
+        # Column major, so that each column is written contiguously and
+        # pandas can use the array without copying it
+        values = np.empty((t_steps, len(col_idx)), order="F")
+        for j, col in enumerate(col_idx):
+            values[:, j] = self._read_result_column(col, t_steps)
+
+        return time, values
+
+    def get_dynamic_results(self, elm_name, var_name, copy=True):
+        """Get the time series of one variable from the dynamic simulation.
+
+        Args:
+            elm_name: Name of the element including class, e.g. SM1.ElmSym
+            var_name: Name of the variable, e.g. m:P:bus1
+            copy: If False the arrays are views of buffers that are reused,
+                and overwritten, by the next call with copy=False. This
+                needs ElmRes.GetColumnValues, without it new arrays are
+                always returned.
+
+        Returns:
+            time: Array with the simulation time.
+            values: Array with the values of the variable.
+        """
+        element = self._get_one(elm_name)
+        if copy or getattr(self.res, "GetColumnValues", None) is None:
+            time, values = self._get_result_columns([(element, var_name)])
+            return time, values[:, 0]
+
+        t_steps = self._load_results()
+        col = self._find_column(element, var_name)
+        time = self._read_result_column(
+            -1, t_steps, self._get_buffer("_time_buf", t_steps))
+        values = self._read_result_column(
+            col, t_steps, self._get_buffer("_val_buf", t_steps))
+        return time, values
+
+    def get_dynamic_results_matrix(self, elm_names, var_name):
+        """Get the time series of one variable for several elements.
+
+        The result file is only loaded once and the columns of all the
+        elements are read in the same pass.
+
+        Args:
+            elm_names: Names of the elements including class,
+                e.g. [SM1.ElmSym, SM2.ElmSym]
+            var_name: Name of the variable, e.g. s:firel
+
+        Returns:
+            time: Array with the simulation time.
+            values: 2-D array with one column for each element.
+        """
+        return self._get_result_columns(
+            [(self._get_one(elm_name), var_name) for elm_name in elm_names])
+
+    def get_freq_metrics(self, machine_names=None, var_name="n:fehz:bus1",
+                         tol=0.01):
+        """Get the frequency nadir, rocof and settling time of machines.
+
+        Args:
+            machine_names: Names of the machines, the default is all
+                machines in self.gens that are in service, as those are
+                the machines monitored by generate_variables.
+            var_name: The frequency variable to use.
+            tol: Band around the final value that counts as settled.
+
+        Returns:
+            Dataframe with the metrics indexed by machine name.
+        """
+        if machine_names is None:
+            machine_names = [name for name, gen in self.gens.items()
+                             if gen.in_service]
+        time, freq = self.get_dynamic_results_matrix(
+            [name + ".ElmSym" for name in machine_names], var_name)
+        nadir, rocof, settling_time = freq_metrics(time, freq, tol)
+        return pd.DataFrame({"nadir": nadir, "rocof": rocof,
+                             "settling_time": settling_time},
+                            index=machine_names)
+
+    def series_stats(self, elm_name, var_name):
+        """Get the mean, maximum and rms value of a simulated variable.
+
+        Args:
+            elm_name: Name of the element including class, e.g. SM1.ElmSym
+            var_name: Name of the variable, e.g. m:P:bus1
+
+        Returns:
+            dict: The mean, max and rms of the variable.
+        """
+        _, values = self.get_dynamic_results(elm_name, var_name)
+        return {"mean": values.mean(), "max": values.max(),
+                "rms": np.sqrt(np.dot(values, values)/len(values))}
+
+    def get_all_dynamic_results(self, variables=None):
+        """Get all monitored variables from the dynamic simulation.
+
+        The result file is read once, instead of once per variable as
+        when calling get_dynamic_results repeatedly.
+
+        Args:
+            variables  (dict):     maps pf-object to list of variables.
+
+        Returns:
+            dataframe: two-level dataframe with simulation results
+        """
+        columns = self._get_monitored_columns(variables)
+        time, values = self._get_result_columns(columns)
+
+        return pd.DataFrame(values, index=pd.Index(time, name="time"),
+                            columns=self._get_result_header(columns))
+
+    def export_dynamic_results(self, filepath, variables=None,
+                               chunk_size=65536):
+        """Write the dynamic simulation results to a csv-file in chunks.
+
+        Only chunk_size rows are formatted and written at a time, so no
+        dataframe of the full result is built. With ElmRes.GetColumnValues
+        the columns are still read whole, so the full numeric array is
+        kept in memory. Without it the rows are also read in chunks. The
+        file has the same two header rows as the files of
+        write_results_to_file, so it can be read with read_results_file.
+
+        Args:
+            filepath (string):  filename for the csv-file
+            variables  (dict):     maps pf-object to list of variables.
+            chunk_size (int): Number of rows to write at a time.
+        """
+        columns = self._get_monitored_columns(variables)
+
+        if getattr(self.res, "GetColumnValues", None) is not None:
+            # Whole columns are read at once, only the writing is chunked
+            time, values = self._get_result_columns(columns)
+            chunks = [(time[start:start + chunk_size],
+                       values[start:start + chunk_size])
+                      for start in range(0, len(time), chunk_size)]
+        else:
+            t_steps = self._load_results()
+            col_idx = [self._find_column(element, var)
+                       for element, var in columns]
+            chunks = (self._read_result_rows(
+                col_idx, start, min(start + chunk_size, t_steps))
+                for start in range(0, t_steps, chunk_size))
+
+        with open(filepath, "w", newline="") as f:
+            writer = csv.writer(f, lineterminator=os.linesep)
+            writer.writerow(["time"] + [element.loc_name
+                                        for element, _ in columns])
+            writer.writerow(["b:tnow"] + [var for _, var in columns])
+            for chunk_time, chunk_values in chunks:
+                pd.DataFrame(chunk_values, index=chunk_time).to_csv(
+                    f, header=False)
+
     def generate_variables(
         self,
         var_machines=("m:u:bus1", "m:P:bus1", "s:outofstep", "s:firel"),
@@ -271,16 +976,16 @@ class PFactoryGrid(object):
         Returns: 
             Dictionary with all machines with all input variables 
         """
-        output = {}
-        for name, gen in self.gens.items():
-            if gen.in_service:
-                output[name + ".ElmSym"] = list(var_machines)
-        for name in self.loads.keys():
-            output[name + ".ElmLod"] = list(var_loads)
-        for name in self.lines.keys():
-            output[name + ".ElmLne"] = list(var_lines)
-        for name in self.buses.keys():
-            output[name + ".ElmTerm"] = list(var_buses)
+        # All elements of a class share the same tuple of variables
+        var_machines = tuple(var_machines)
+        var_loads = tuple(var_loads)
+        var_lines = tuple(var_lines)
+        var_buses = tuple(var_buses)
+        output = {name + ".ElmSym": var_machines
+                  for name, gen in self.gens.items() if gen.in_service}
+        output.update({name + ".ElmLod": var_loads for name in self.loads})
+        output.update({name + ".ElmLne": var_lines for name in self.lines})
+        output.update({name + ".ElmTerm": var_buses for name in self.buses})
         return output
 
     def check_islands(self):
@@ -290,12 +995,9 @@ class PFactoryGrid(object):
             true if there is islands and false if not
         """
         var = "ipat"
-        island_var = []
-        for bus in self.buses.keys():
-            isolated_area_result = self.result.loc[1:1000, (bus, var)].values
-            end_val = len(isolated_area_result) - 1
-            island_var.append(isolated_area_result[end_val])
-        return max(island_var)
+        # Take the island ids of all buses at once
+        island_var = self.result.loc[1:1000].xs(var, axis=1, level=1)
+        return island_var[list(self.buses)].iloc[-1].max()
 
     def get_island_elements(self, islands):
         """ Return list of elemnts of the islands. 
@@ -307,15 +1009,12 @@ class PFactoryGrid(object):
             its elements
         """
         var = "ipat"
-        element_list = []
-        counter = 0
-        while islands - counter > 0:
-            element_list.append([])
-            counter += 1
-        for elm in self.buses.keys():
-            isolated_area_result = self.result.loc[:, (elm, var)].values
-            end_val = len(isolated_area_result) - 1
-            element_list[int(isolated_area_result[end_val]) - 1].append(elm)
+        element_list = [[] for _ in range(int(islands))]
+        buses = list(self.buses)
+        # The island id of each bus at the end of the simulation
+        island_ids = self.result.xs(var, axis=1, level=1)[buses].iloc[-1]
+        for elm, island_id in zip(buses, island_ids.to_numpy().astype(int)):
+            element_list[island_id - 1].append(elm)
         return element_list
 
     def get_init_value(self, feature_name, loads, machines, tripped_lines,
@@ -333,31 +1032,14 @@ class PFactoryGrid(object):
         """
         value = -1
         if feature_name == "COI angle":
-            if dynamic: 
+            if dynamic:
                 init_ang = self.get_initial_rotor_angles(
                     machine_names=machines)
-                num = 0
-                denum = 0
-                for i, m in enumerate(machines):
-                    num += (
-                        self.get_inertia(m)
-                        * self.get_number_of_parallell(m) * init_ang[i]
-                    )
-                    denum += self.get_inertia(
-                        m) * self.get_number_of_parallell(m)
-                value = num / denum
-            else: 
+            else:
                 init_ang = self.get_rotor_angles_static(machine_names=machines)
-                num = 0
-                denum = 0
-                for i, m in enumerate(machines):
-                    num += (
-                        self.get_inertia(
-                            m) * self.get_number_of_parallell(m) * init_ang[i]
-                    )
-                    denum += self.get_inertia(
-                        m) * self.get_number_of_parallell(m)
-                value = num / denum
+            weights = self._get_inertia_weights(machines)
+            angles = np.asarray(init_ang, dtype=np.float64)
+            value = float(np.dot(weights, angles) / weights.sum())
         elif feature_name == "Production":
             value = 0
             if dynamic: 
@@ -365,10 +1047,9 @@ class PFactoryGrid(object):
                     production = self.get_active_power(machine)
                     value += production[0]
             else: 
+                syms = self._by_name("ElmSym")
                 for machine in machines:
-                    machine_obj = self.app.GetCalcRelevantObjects(
-                        machine+".ElmSym")
-                    value += machine_obj.pgini
+                    value += syms[machine].pgini
         elif feature_name == "Net flow":
             net_flow = 0
             for line in tripped_lines:
@@ -388,19 +1069,47 @@ class PFactoryGrid(object):
                     consumption = self.get_active_power(load)
                     value += consumption[0]
             else: 
+                lods = self._by_name("ElmLod")
                 for load in loads:
-                    load_obj = self.app.GetCalcRelevantObjects(
-                        machine+".ElmLod")
-                    value += load_obj.plini
+                    value += lods[load].plini
         elif feature_name == "Inertia":
-            value = 0
-            for machine in machines:
-                value += self.get_inertia(
-                    machine) * self.get_number_of_parallell(machine)
+            value = float(self._get_inertia_weights(machines).sum())
         elif feature_name == "Clearing time":
             print("Clearing time: NotImplementedError")
         return value
 
+    def get_inertia(self, machine_name):
+        """Return the inertia constant, H, of a machine.
+
+        Args:
+            machine_name: Name of the machine.
+        """
+        return self._by_name("ElmSym")[machine_name].typ_id.h
+
+    def get_number_of_parallell(self, machine_name):
+        """Return the number of parallel machines of a generator.
+
+        Args:
+            machine_name: Name of the machine.
+        """
+        return self._by_name("ElmSym")[machine_name].ngnum
+
+    def _get_inertia_weights(self, machine_names):
+        """Return the inertia times the number of parallel machines.
+
+        Each machine is only looked up once and both attributes are read
+        from the same object.
+
+        Args:
+            machine_names: Names of the machines.
+        """
+        syms = self._by_name("ElmSym")
+        weights = np.empty(len(machine_names), dtype=np.float64)
+        for i, name in enumerate(machine_names):
+            sym = syms[name]
+            weights[i] = sym.typ_id.h * sym.ngnum
+        return weights
+
     def find_connected_element(self, elm_name, elm_type):
         """ Find connected elements of elm_type connected to an elm_name
 
@@ -410,17 +1119,16 @@ class PFactoryGrid(object):
         Returns:
             connected_element: name of connected element of elm_type
         """
-        elm = self.app.GetCalcRelevantObjects(elm_name + ".*")[0]
+        elm = self._get_one(elm_name + ".*")
         cubicles = elm.GetCalcRelevantCubicles()
+        # Check the class of the element in each cubicle directly instead
+        # of searching the grid for an element with the same name
+        class_name = elm_type.lstrip(".")
         for cubicle in cubicles:
-            connected_element = cubicle.obj_id.loc_name
-            try:
-                load = self.app.GetCalcRelevantObjects(
-                    connected_element + elm_type)[0]
-            except:
-                load = None
-            if load is not None:
-                return connected_element
+            connected = cubicle.obj_id
+            if (connected is not None
+                    and connected.GetClassName() == class_name):
+                return connected.loc_name
 
     def pole_slip(self, machine_name):
         """ Check if there has been a pole slip at any active machines 
@@ -431,13 +1139,40 @@ class PFactoryGrid(object):
             true if there has been a pole slip at machine
         """
         var = "outofstep"
-        pole_var = self.result.loc[:, (machine_name, var)].values
-        pole_slip = False
-        if np.count_nonzero(pole_var) > 0:
-            pole_slip = True
+        pole_var = self.result.loc[:, (machine_name, var)].to_numpy()
+
+        return bool(pole_var.any())
+
+    def pole_slips(self):
+        """ Check if there has been a pole slip at each of the machines
+
+        All machines are checked at once on the result matrix instead of
+        calling pole_slip for each machine.
+
+        Returns:
+            Series with the machine names as index that is true for the
+            machines that have slipped a pole.
+        """
+        pole_var = self.result.xs("outofstep", axis=1, level=1)
+        return pd.Series(pole_var.to_numpy().any(axis=0),
+                         index=pole_var.columns)
+
+    def check_if_in_service(self, machine_name):
+        """Check if a machine is in service.
+
+        Args:
+            machine_name: Name of the machine.
+        """
+        return not self._by_name("ElmSym")[machine_name].outserv
+
+    def is_ref(self, machine_name):
+        """Check if a machine is the reference machine.
+
+        Args:
+            machine_name: Name of the machine.
+        """
+        return bool(self._by_name("ElmSym")[machine_name].ip_ctrl)
 
-        return pole_slip
-    
     def get_rotor_angles_static(self, machine_names=None): 
         """ Get relative rotor angles from load flow simulations
         
@@ -445,48 +1180,58 @@ class PFactoryGrid(object):
             Initial relative rotor angles for all machines 
         """
         if machine_names is None:
-            machines = self.app.GetCalcRelevantObjects("*.ElmSym")
+            machines = self._relevant("*.ElmSym")
         else:
-            machines = []
-            for machine_name in machine_names:
-                machine_object = self.app.GetCalcRelevantObjects(
-                    machine_name + ".ElmSym"
-                )
-                machines.append(machine_object[0])
-        rotor_ang = []
-        phi_ref = 0
-        for m in machines:
-            if self.check_if_in_service(m.loc_name):
-                u_t = m.GetAttribute("n:u1:bus1")
-                i_t = m.GetAttribute("m:i1:bus1")
-                r_stator = m.typ_id.rstr
-                x_q = m.typ_id.xq
-                phi = np.arctan(u_t + i_t*(r_stator+x_q))*180/np.pi - 90
-                if self.is_ref(m.loc_name):
-                    rotor_ang.append(0)
-                    phi_ref = phi
-                else:
-                    rotor_ang.append(phi-phi_ref-m.GetAttribute(
-                        "n:phiurel:bus1"))
-        return rotor_ang
-
-    def get_initial_rotor_angles(self):
+            syms = self._by_name("ElmSym")
+            machines = [syms[machine_name] for machine_name in machine_names]
+        machines = [m for m in machines if not m.outserv]
+        n = len(machines)
+        u_t = np.empty(n)
+        i_t = np.empty(n)
+        x = np.empty(n)
+        phiurel = np.empty(n)
+        is_ref = np.empty(n, dtype=bool)
+        for k, m in enumerate(machines):
+            typ = m.typ_id
+            u_t[k] = m.GetAttribute("n:u1:bus1")
+            i_t[k] = m.GetAttribute("m:i1:bus1")
+            x[k] = typ.rstr + typ.xq
+            phiurel[k] = m.GetAttribute("n:phiurel:bus1")
+            is_ref[k] = m.ip_ctrl
+        phi = np.degrees(np.arctan(u_t + i_t*x)) - 90
+
+        # Each machine is relative to the last reference machine before it
+        # in the list, or to 0 if there is none.
+        last_ref = np.maximum.accumulate(np.where(is_ref, np.arange(n), -1))
+        phi_ref = np.where(last_ref >= 0, phi[last_ref], 0)
+        rotor_ang = np.where(is_ref, 0, phi - phi_ref - phiurel)
+        return rotor_ang.tolist()
+
+    def get_initial_rotor_angles(self, machine_names=None):
         """ Get initial relative rotor angles 
-        
+
+        Args:
+            machine_names: Names of the machines, the default is all
+                machines in self.gens.
+
         Returns: 
             Initial relative rotor angles for all machines 
         """
         var = "firel"
+        if machine_names is None:
+            machine_names = list(self.gens)
+        gens = self.gens
+        # Take the angles of all machines at the first time step at once
+        # instead of indexing the result frame for each machine
+        first = self.result.loc[0]
+        angles = first.xs(var, level=1)
         initial_ang = []
-        for name, gen in self.gens.items():
-            if gen.in_service:
-                pole_slip = self.result.loc[
-                    0, (name, "outofstep")
-                ]  # always float
-                angle = self.result.loc[0, (name, var)]  # .values
-                if type(angle) != type(pole_slip):
-                    angle = angle.replace(",", ".")
-                    angle = float(angle)
+        for name in machine_names:
+            if gens[name].in_service:
+                angle = angles[name]
+                # Results read from a csv-file with decimal comma
+                if isinstance(angle, str):
+                    angle = float(angle.replace(",", "."))
                 initial_ang.append(angle)
             else:
                 initial_ang.append(0)
@@ -500,17 +1245,13 @@ class PFactoryGrid(object):
             Voltage angles for all machines 
         """
         if machine_names is None:
-            machines = self.app.GetCalcRelevantObjects("*.ElmSym")
+            machines = self._relevant("*.ElmSym")
         else:
-            machines = []
-            for machine_name in machine_names:
-                machine_object = self.app.GetCalcRelevantObjects(
-                    machine_name + ".ElmSym"
-                )
-                machines.append(machine_object[0])
+            syms = self._by_name("ElmSym")
+            machines = [syms[machine_name] for machine_name in machine_names]
         initial_ang = []
         for m in machines:
-            if self.check_if_in_service(m.loc_name):
+            if not m.outserv:
                 initial_ang.append(m.GetAttribute("n:phiurel:bus1"))
             else:
                 initial_ang.append(0)
@@ -522,23 +1263,26 @@ class PFactoryGrid(object):
         2HS/omega_0. 
 
         Returns: 
-            List with machine name and corresponding inertia 
+            names: List with the machine names.
+            inertias: Array with the corresponding inertias.
         """
         # generator types (ed up with H array)
         omega_0 = 50
-        machine_list = self.app.GetCalcRelevantObjects("*.ElmSym")
-        machine_type = []
-        machine_name = []
+        scale = 2 / omega_0
+        machine_list = self._relevant("*.ElmSym")
+        names = [None] * len(machine_list)
+        inertias = np.empty(len(machine_list), dtype=np.float64)
         # Identify the machine type
         # (GENSAL - salient pole, or GENROU - round pole)
-        for machine in machine_list:
-            machine_type.append(machine.typ_id)
-            machine_name.append(machine.loc_name)
-        inertias = []
-        for machine in machine_type:
-            inertias.append(2 * machine.sgn * machine.h / omega_0)
-        inertia_list = np.column_stack([machine_name, inertias])
-        return inertia_list
+        for i, machine in enumerate(machine_list):
+            machine_type = machine.typ_id
+            names[i] = machine.loc_name
+            inertias[i] = scale * machine_type.sgn * machine_type.h
+        return names, inertias
+
+    def _get_event_folder(self):
+        """Return the event folder of the active study case."""
+        return self._from_study_case("IntEvt")
 
     def create_short_circuit(self, target, time, name):
         """Create a three phase short circuit.
@@ -549,20 +1293,17 @@ class PFactoryGrid(object):
             name: Name of the event.
         """
         # Get the event folder
-        evt_folder = self.app.GetFromStudyCase("IntEvt")
-
-        # Get event name of events in folder
-        events = [i.loc_name for i in evt_folder.GetContents("*.EvtShc")]
+        evt_folder = self._get_event_folder()
 
-        # Delete existing events with the same name
-        if name in events:
+        # Delete existing events with the same name. Only the event with
+        # this name is looked up, instead of reading the names of all events
+        if evt_folder.GetContents(name + ".EvtShc"):
             self.delete_short_circuit(name)
 
         # Create an empty short circuit event
-        evt_folder.CreateObject("EvtShc", name)
-
-        # Get the empty short circuit event
-        sc = evt_folder.GetContents(name + ".EvtShc")[0]
+        sc = evt_folder.CreateObject("EvtShc", name)
+        if sc is None:
+            sc = evt_folder.GetContents(name + ".EvtShc")[0]
 
         # Set time, target and type of short circuit
         sc.time = time
@@ -576,7 +1317,7 @@ class PFactoryGrid(object):
             name: Name of the event.
          """
         # Get the event folder
-        evt_folder = self.app.GetFromStudyCase("IntEvt")
+        evt_folder = self._get_event_folder()
 
         # Find the short circuit and clear event to delete
         sc = evt_folder.GetContents(name + ".EvtShc")
@@ -599,20 +1340,17 @@ class PFactoryGrid(object):
             name = target.name + "_switch"
 
         # Get the event folder
-        evt_folder = self.app.GetFromStudyCase("IntEvt")
-
-        # Get event name of events in folder
-        events = [i.loc_name for i in evt_folder.GetContents("*.EvtSwitch")]
+        evt_folder = self._get_event_folder()
 
-        # Delete existing events with the same name
-        if name in events:
+        # Delete existing events with the same name. Only the event with
+        # this name is looked up, instead of reading the names of all events
+        if evt_folder.GetContents(name + ".EvtSwitch"):
             self.delete_switch_event(name)
 
         # Create an empty switch event
-        evt_folder.CreateObject("EvtSwitch", name)
-
-        # Get the empty switch event
-        sw = evt_folder.GetContents(name + ".EvtSwitch")[0]
+        sw = evt_folder.CreateObject("EvtSwitch", name)
+        if sw is None:
+            sw = evt_folder.GetContents(name + ".EvtSwitch")[0]
 
         # Set time, target and type of short circuit
         sw.time = time
@@ -625,7 +1363,7 @@ class PFactoryGrid(object):
             name: Name of the event.
          """
         # Get the event folder
-        evt_folder = self.app.GetFromStudyCase("IntEvt")
+        evt_folder = self._get_event_folder()
 
         # Find the switch event and clear event to delete
         sw = evt_folder.GetContents(name + ".EvtSwitch")
@@ -635,28 +1373,55 @@ class PFactoryGrid(object):
         if sww:
             sww[0].Delete()
 
+    def create_trip_line_event(self, target_name, time):
+        """Trip a line by opening the breakers at both ends.
+
+        The events are named trip-<line>-<end>, where end is 0 for the
+        from end and 1 for the to end. Ends without a breaker are skipped.
+
+        Args:
+            target_name: Name of the line to trip.
+            time: When to trip the line.
+
+        Raises:
+            ValueError: If the line has no breaker at either end.
+        """
+        switches = self.lines[target_name].switches
+        if all(switch is None for switch in switches):
+            raise ValueError(f"{target_name} has no breakers to trip")
+        for i, switch in enumerate(switches):
+            if switch is not None:
+                self.create_switch_event(Component(switch), time,
+                                         f"trip-{target_name}-{i}")
+
+    def delete_trip_line_event(self, target_name):
+        """Delete the events of create_trip_line_event.
+
+        Args:
+            target_name: Name of the tripped line.
+        """
+        for i, switch in enumerate(self.lines[target_name].switches):
+            if switch is not None:
+                self.delete_switch_event(f"trip-{target_name}-{i}")
+
     def clear_all_events(self):
 
         # Get the event folder
-        evt_folder = self.app.GetFromStudyCase("IntEvt")
+        evt_folder = self._get_event_folder()
         # Get a list of all events
         events = evt_folder.GetContents("*")
 
-        # Loop through all events and use the correct delete function
+        # Delete the switch and short circuit events directly, instead of
+        # looking each of them up by name again. Their clear events are
+        # of the same classes and are deleted in the same loop. The events
+        # of create_trip_line_event are switch events.
         for e in events:
-            evt_name = e.loc_name
-            evt_class = e.GetClassName()
-            if evt_class == "EvtSwitch":
-                self.delete_short_circuit(evt_name)
-            elif evt_class == "EvtShc":
-                if evt_name.split("-")[0] == "trip":
-                    self.delete_trip_line_event(evt_name)
-                else:
-                    self.delete_switch_event(evt_name)
+            if e.GetClassName() in ("EvtSwitch", "EvtShc"):
+                e.Delete()
 
     def get_events(self):
         """ Return a list of events """
-        evt_folder = self.app.GetFromStudyCase("IntEvt")
+        evt_folder = self._get_event_folder()
         events = [i.loc_name for i in evt_folder.GetContents()]
         return events
 
@@ -704,12 +1469,14 @@ class PFactoryGrid(object):
             attribute (str)
             element_type (str) e.g. *.ElmSym for all generators
         """
-        for elm in self.app.GetCalcRelevantObjects(element_type):
-            for k, v in attr.items():
-                if k in relative_attr.keys():
-                    base_val = getattr(elm, relative_attr[k])
-                    v_mod = np.array(v) * base_val
-                    setattr(elm, k, v_mod.tolist())
+        # Convert the relative values to arrays once for all elements
+        prepared = [(k, relative_attr[k], np.asarray(v, dtype=np.float64))
+                    if k in relative_attr else (k, None, v)
+                    for k, v in attr.items()]
+        for elm in self._relevant(element_type):
+            for k, rel_attr, v in prepared:
+                if rel_attr is not None:
+                    setattr(elm, k, (v * getattr(elm, rel_attr)).tolist())
                 else:
                     setattr(elm, k, v)
 
@@ -728,6 +1495,7 @@ class PFactoryGrid(object):
                         penaltyCost: float
                         fixedCost: float
         """
+        syms = self._by_name("ElmSym")
         for cf, cost_data in cost_dict.items():
 
             if len(cost_data["ccost"]) != len(cost_data["cpower"]):
@@ -737,7 +1505,7 @@ class PFactoryGrid(object):
 
             for gen_name in gen_set:
                 relative_attr = ["ccost", "cpower"]
-                gen = self.app.GetCalcRelevantObjects(gen_name + ".ElmSym")[0]
+                gen = syms[gen_name]
                 for k, v in cost_data.items():
                     if k == "generators":
                         continue
@@ -785,8 +1553,7 @@ class PFactoryGrid(object):
                                         busbars/terminal
         """
 
-        if not hasattr(self, "opf"):
-            self.opf = self.app.GetFromStudyCase("ComOpf")
+        self.opf = self._from_study_case("ComOpf")
 
         self.opf.ipopt_ACDC = power_flow
         self.opf.iopt_obj = obj_function
@@ -800,31 +1567,26 @@ class PFactoryGrid(object):
 
         opf_res = {}
 
-        gens = self.app.GetCalcRelevantObjects("*.ElmSym")
-        gen_var = ["c:avgCosts", "c:Pdisp", "c:cst_disp"]
-        for gen in gens:
-            gen_name = gen.GetFullName().split("\\")[-1].split(".")[0]
-            opf_res[gen_name] = {i.split(":")[1]: gen.GetAttribute(i)
-                                 for i in gen_var}
-
-        loads = self.app.GetCalcRelevantObjects("*.ElmLod")
-        load_var = ["m:P:bus1", "c:Pmism"]
-        for load in loads:
-            load_name = load.GetFullName().split("\\")[-1].split(".")[0]
-            opf_res[load_name] = {
-                i.split(":")[1]: load.GetAttribute(i) for i in load_var
-            }
-
-        lines = self.app.GetCalcRelevantObjects("*.ElmLne")
-        line_var = ["m:P:bus1", "c:loading"]
-        for line in lines:
-            if not line.outserv:
-                line_name = line.GetFullName().split('\\')[-1].split('.')[0]
-                opf_res[line_name] = {
-                  i.split(':')[1]: line.GetAttribute(i) for i in line_var
-                }
-
-        grid = self.app.GetCalcRelevantObjects('*.ElmNet')[0]
+        def read_vars(objs, var_names):
+            """Read var_names of all objs into opf_res by object name."""
+            # Split the variable names once instead of once per object
+            keys = [(i.split(":")[1], i) for i in var_names]
+            for obj in objs:
+                obj_name = self._full_name(obj).rpartition("\\")[2]
+                get_attribute = obj.GetAttribute
+                opf_res[obj_name.split(".")[0]] = {
+                    key: get_attribute(var) for key, var in keys}
+
+        read_vars(self._relevant("*.ElmSym"),
+                  ["c:avgCosts", "c:Pdisp", "c:cst_disp"])
+
+        read_vars(self._relevant("*.ElmLod"), ["m:P:bus1", "c:Pmism"])
+
+        read_vars([line for line in self._relevant("*.ElmLne")
+                   if not line.outserv],
+                  ["m:P:bus1", "c:loading"])
+
+        grid = self._get_one('*.ElmNet')
         sys_var = ['c:cst_disp', 'c:LossP', 'c:LossQ', 'c:GenP', 'c:GenQ']
         opf_res['system'] = {i.split(':')[1]: grid.GetAttribute(i)
                              for i in sys_var}
@@ -870,14 +1632,16 @@ class PFactoryGrid(object):
 
         gens = self.gens.values()
         isf = np.zeros((len(lines), len(gens)))
-        for idx, gen in enumerate(gens):
-            # Run load flow before changing the power
-            if self.run_load_flow(balanced, power_control, slack):
-                raise RuntimeError("Power flow did not converge")
 
-            # Get the load flow before changing power
-            y_0 = [line.p for line in lines.values()]
+        # Run load flow before changing the power. The power is changed
+        # back after each generator, so the base case is the same for all.
+        if self.run_load_flow(balanced, power_control, slack):
+            raise RuntimeError("Power flow did not converge")
+
+        # Get the load flow before changing power
+        y_0 = [line.p for line in lines.values()]
 
+        for idx, gen in enumerate(gens):
             # Change flow and calculate ISF
             p = float(gen.p_set)
             gen.p_set = delta_p+p
@@ -895,23 +1659,25 @@ class PFactoryGrid(object):
         Args:
             res_file: The name of the file to read the results from.
         """
-        mode = self.app.GetFromStudyCase("ComMod")  # Modal analysis
+        mode = self._from_study_case("ComMod")  # Modal analysis
         mode.Execute()
         res = self.app.GetFromStudyCase(res_file+'.ElmRes')
         res.Load()  # load the data for reading
-        # We want to store a, b, frequency, and damping
-        df = pd.DataFrame(np.zeros((res.GetNumberOfRows(), 4)),
-                          columns=["a", "b", "damping", "frequency"])
-        min_damping = np.inf
-        for i in range(0, res.GetNumberOfRows()):
-            a = res.GetValue(i, 0)[1]
-            b = res.GetValue(i, 1)[1]
-            df.iloc[i, 3] = abs(b/2/np.pi)
-            df.iloc[i, 0] = a
-            df.iloc[i, 1] = b
-            df.iloc[i, 2] = -a/np.sqrt(a**2 + b**2)
-            if df.iloc[i, 2] < min_damping:
-                min_damping = df.iloc[i, 2]
+        n_rows = res.GetNumberOfRows()
+        get_value = res.GetValue
+        # Read the real and imaginary parts, a and b, and calculate the
+        # damping and frequency for all eigenvalues at once
+        a = np.fromiter((get_value(i, 0)[1] for i in range(n_rows)),
+                        dtype=np.float64, count=n_rows)
+        b = np.fromiter((get_value(i, 1)[1] for i in range(n_rows)),
+                        dtype=np.float64, count=n_rows)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            damping = -a/np.sqrt(a**2 + b**2)
+        df = pd.DataFrame({"a": a, "b": b, "damping": damping,
+                           "frequency": np.abs(b/2/np.pi)})
+        # Eigenvalues at the origin have no damping and are skipped
+        min_damping = float(damping.min(initial=np.inf,
+                                        where=~np.isnan(damping)))
 
         return EigenValueResults(df, min_damping)
 
@@ -922,9 +1688,13 @@ class PFactoryGrid(object):
 
     def init_objs_from_df(self, df, objs):
         """Initialise an object type from df."""
-        for obj in df.index:
-            for prop in df.columns:
-                setattr(objs[obj], prop, df.loc[obj, prop])
+        # Iterate the rows directly instead of looking up each cell
+        columns = list(df.columns)
+        for name, values in zip(df.index,
+                                df.itertuples(index=False, name=None)):
+            obj = objs[name]
+            for prop, value in zip(columns, values):
+                setattr(obj, prop, value)
 
     def change_os(self, series):
         """Initialise the grid from a pandas Series
@@ -934,17 +1704,170 @@ class PFactoryGrid(object):
         should be the name of the component, and the third index is the
         property to set."""
 
-        for idx in series.index:
+        for idx, value in series.items():
             obj = getattr(self, idx[0])
-            setattr(obj[idx[1]], idx[2], series[idx])
+            setattr(obj[idx[1]], idx[2], value)
+
+    def set_load_powers(self, p_load, q_load=None):
+        """Set the active and reactive power of loads.
+
+        Only the loads in p_load are visited, so the cost does not depend
+        on the number of loads in the grid. Unknown names are ignored.
+
+        Args:
+            p_load: Dictionary mapping load names to active power.
+            q_load: Dictionary mapping load names to reactive power. Loads
+                that are not in q_load keep their reactive power.
+        """
+        if q_load is None:
+            q_load = {}
+        loads = self.loads
+        for name, p in p_load.items():
+            load = loads.get(name)
+            if load is not None:
+                load.p_set = p
+                if name in q_load:
+                    load.q_set = q_load[name]
+
+    def set_load_powers_bulk(self, p, q):
+        """Set the active and reactive power of all loads from arrays.
+
+        Args:
+            p: Array with the active power of each load, in the same order
+                as self.loads.
+            q: Array with the reactive power of each load, in the same
+                order as self.loads.
+
+        Raises:
+            ValueError: If p or q does not have one value for each load.
+        """
+        # tolist gives python floats in one go instead of boxing each
+        # numpy scalar in the loop.
+        p = np.asarray(p).tolist()
+        q = np.asarray(q).tolist()
+        if len(p) != len(self.loads) or len(q) != len(self.loads):
+            raise ValueError(f"Expected {len(self.loads)} load powers, got "
+                             f"{len(p)} active and {len(q)} reactive")
+        for load, p_i, q_i in zip(self.loads.values(), p, q):
+            load.pf_object.plini = p_i
+            load.pf_object.qlini = q_i
+
+    def set_generator_powers(self, p_gen, q_gen):
+        """Set the active and reactive power of generators.
+
+        The powers are the total of all machines in parallel. Only the
+        generators in p_gen are visited and unknown names are ignored.
+
+        Args:
+            p_gen: Dictionary mapping generator names to active power.
+            q_gen: Dictionary mapping generator names to reactive power.
+        """
+        gens = self.gens
+        for name, p in p_gen.items():
+            gen = gens.get(name)
+            if gen is not None:
+                gen.p_set = p
+                gen.q_set = q_gen[name]
 
     def get_total_load(self):
         """Return the total load of the system."""
-        return sum(load.p_set for load in self.loads.values())
+        lods = [load.pf_object for load in self.loads.values()]
+        return float(np.fromiter((lod.plini for lod in lods),
+                                 dtype=np.float64, count=len(lods)).sum())
     
     def get_total_gen(self):
-        """Return the total load of the system."""
-        return sum(gen.p_set for gen in self.gens.values())
+        """Return the total generation of the system."""
+        return float(np.dot(self.get_machine_gen_array(),
+                            self.get_number_of_parallell_array()))
+
+    def get_area_loads(self):
+        """Return the total load of each area.
+
+        Returns:
+            Series with the total load indexed by area name.
+        """
+        lods = [load.pf_object for load in self.loads.values()]
+        p = np.fromiter((lod.plini for lod in lods), dtype=np.float64,
+                        count=len(lods))
+        areas = [load.areaname for load in self.loads.values()]
+        return pd.Series(p, index=areas).groupby(level=0).sum()
+
+    def get_area_gens(self):
+        """Return the total generation of each area.
+
+        Returns:
+            Series with the total generation indexed by area name.
+        """
+        p = (self.get_machine_gen_array() *
+             self.get_number_of_parallell_array())
+        areas = [gen.areaname for gen in self.gens.values()]
+        return pd.Series(p, index=areas).groupby(level=0).sum()
+
+    def get_machine_gen_array(self):
+        """Return the active power of each machine as an array.
+
+        The power is per machine, i.e. it does not consider machines in
+        parallel. The order is the same as in self.gens."""
+        syms = [gen.pf_object for gen in self.gens.values()]
+        return np.fromiter((sym.pgini for sym in syms), dtype=np.float64,
+                           count=len(syms))
+
+    def get_number_of_parallell_array(self):
+        """Return the number of parallel machines of each generator.
+
+        The order is the same as in self.gens."""
+        syms = [gen.pf_object for gen in self.gens.values()]
+        return np.fromiter((sym.ngnum for sym in syms), dtype=np.int32,
+                           count=len(syms))
+
+    def set_in_service_bulk(self, names):
+        """Set several generators in service.
+
+        Args:
+            names: The names of the generators to set in service."""
+        gens = self.gens
+        for name in names:
+            gens[name].pf_object.outserv = 0
+
+    def set_all_in_service(self, class_filter="*.ElmSym"):
+        """Set all elements matching a filter in service.
+
+        The changes are collected in the powerfactory write cache and
+        written to the database at once.
+
+        Args:
+            class_filter: Filter for the elements, the default is all
+                synchronous machines."""
+        self.app.SetWriteCacheEnabled(1)
+        try:
+            for elm in self.app.GetCalcRelevantObjects(class_filter):
+                elm.outserv = 0
+        finally:
+            self.app.WriteChangesToDb()
+            self.app.SetWriteCacheEnabled(0)
+
+    def set_number_of_parallell_bulk(self, names, n_machines,
+                                     in_service=False):
+        """Set the number of parallel machines for several generators.
+
+        Args:
+            names: The names of the generators.
+            n_machines: The number of machines in parallel for each
+                generator.
+            in_service: If true the generators are also set in service
+                in the same pass.
+
+        Raises:
+            ValueError: If names and n_machines differ in length."""
+        if len(names) != len(n_machines):
+            raise ValueError(f"Got {len(names)} names but {len(n_machines)} "
+                             "numbers of machines")
+        gens = self.gens
+        for name, val in zip(names, n_machines):
+            gen = gens[name]
+            gen.n_machines = int(val)
+            if in_service:
+                gen.pf_object.outserv = 0
 
     def get_pf_results(self):
         """Return a PFResults object."""
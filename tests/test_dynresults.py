@@ -0,0 +1,33 @@
+"""Test the dynamic result helpers."""
+import numpy as np
+import pytest
+from sinfactory.dynresults import freq_metrics
+
+
+def test_freq_metrics():
+    """Check the metrics of a frequency step that recovers."""
+    time = np.arange(0, 5, 0.01)
+    freq = np.full((len(time), 2), 50.0)
+    # The first machine drops to 49.5 Hz between 1 and 2 s
+    freq[(time >= 1) & (time < 2), 0] = 49.5
+
+    nadir, rocof, settling_time = freq_metrics(time, freq)
+
+    assert nadir == pytest.approx([49.5, 50.0])
+    # A 0.5 Hz step over one central difference of 0.02 s
+    assert rocof[0] == pytest.approx(25.0)
+    assert rocof[1] == pytest.approx(0, abs=1e-9)
+    assert settling_time[0] == pytest.approx(2.0)
+    assert settling_time[1] == 0
+
+
+def test_freq_metrics_repeated_time():
+    """Check the rocof when the time stamp of an event is repeated."""
+    time = np.array([0, 0.01, 0.02, 0.02, 0.03, 0.04])
+    freq = np.array([50.0, 50.0, 50.0, 49.9, 49.9, 49.9])
+
+    _, rocof, _ = freq_metrics(time, freq)
+
+    # A 0.1 Hz step over one central difference of 0.02 s
+    assert np.isfinite(rocof[0])
+    assert rocof[0] == pytest.approx(5.0)
@@ -0,0 +1,72 @@
+"""Test the export of dynamic results with a mocked result file."""
+import sys
+import types
+import numpy as np
+import pytest
+
+# Only the result file is used here, so the tests can run without
+# powerfactory
+try:
+    import powerfactory  # noqa: F401
+except ImportError:
+    sys.modules["powerfactory"] = types.ModuleType("powerfactory")
+from sinfactory.pfactorygrid import PFactoryGrid  # noqa: E402
+
+
+class RowResults(object):
+    """Result file that can only be read a value at a time."""
+
+    def __init__(self, time, columns, values):
+        self.time = time
+        self.columns = columns
+        self.values = values
+
+    def Load(self):
+        pass
+
+    def GetNumberOfRows(self):
+        return len(self.time)
+
+    def FindColumn(self, element, var):
+        try:
+            return self.columns.index((element.loc_name, var))
+        except ValueError:
+            return -1
+
+    def GetValue(self, row, col):
+        if col < 0:
+            return 0, self.time[row]
+        return 0, self.values[row, col]
+
+
+class ColumnResults(RowResults):
+    """Result file that can also be read a column at a time."""
+
+    def GetColumnValues(self, col):
+        if col < 0:
+            return 0, list(self.time)
+        return 0, list(self.values[:, col])
+
+
+@pytest.mark.parametrize("results_class", [RowResults, ColumnResults])
+def test_export_dynamic_results_chunks(tmp_path, results_class):
+    """Check that all rows are written when there are several chunks."""
+    time = np.arange(7)*0.01
+    values = np.arange(14, dtype=np.float64).reshape(7, 2)
+    names = [("SM1", "n:fehz:bus1"), ("SM2", "n:fehz:bus1")]
+
+    grid = PFactoryGrid.__new__(PFactoryGrid)
+    grid.res = results_class(time, names, values)
+    grid._res_rows = None
+    grid._full_name_cache = {}
+    grid._monitor_plan = [(types.SimpleNamespace(loc_name=elm), var)
+                          for elm, var in names]
+
+    filepath = str(tmp_path / "results.csv")
+    grid.export_dynamic_results(filepath, chunk_size=3)
+    res = PFactoryGrid.read_results_file(filepath)
+
+    assert res.shape == (7, 2)
+    assert res.index.to_numpy() == pytest.approx(time)
+    assert res.loc[:, ("SM2", "fehz")].to_numpy() == pytest.approx(
+        values[:, 1])
@@ -33,6 +33,61 @@ def test_run_dynamic_simulation(test_system):
     assert res.iloc[20, :].to_numpy()[0] == pytest.approx(50.0, abs=0.01)
 
 
+def test_get_dynamic_results(test_system):
+    """Check if a single time series can be read from the result file."""
+    variables = {"SM1.ElmSym": ["n:fehz:bus1"]}
+    test_system.prepare_dynamic_sim(variables=variables)
+    test_system.run_dynamic_sim()
+    time, values = test_system.get_dynamic_results("SM1.ElmSym",
+                                                   "n:fehz:bus1")
+    res = test_system.get_all_dynamic_results(variables)
+
+    assert len(time) == len(values)
+    assert values[20] == pytest.approx(50.0, abs=0.01)
+    assert res.loc[:, ("SM1", "fehz")].to_numpy()[20] == pytest.approx(
+        values[20])
+
+
+def test_get_dynamic_results_matrix(test_system):
+    """Check if several elements can be read from the result file at once."""
+    variables = {"SM1.ElmSym": ["n:fehz:bus1"], "SM2.ElmSym": ["n:fehz:bus1"]}
+    test_system.prepare_dynamic_sim(variables=variables)
+    test_system.run_dynamic_sim()
+    time, values = test_system.get_dynamic_results_matrix(
+        ["SM1.ElmSym", "SM2.ElmSym"], "n:fehz:bus1")
+    _, sm2 = test_system.get_dynamic_results("SM2.ElmSym", "n:fehz:bus1")
+
+    assert values.shape == (len(time), 2)
+    assert values[:, 1] == pytest.approx(sm2)
+
+
+def test_export_dynamic_results(test_system, tmp_path):
+    """Check if exported results can be read back with read_results_file."""
+    variables = {"SM1.ElmSym": ["n:fehz:bus1"], "SM2.ElmSym": ["n:fehz:bus1"]}
+    test_system.prepare_dynamic_sim(variables=variables)
+    test_system.run_dynamic_sim()
+    filepath = str(tmp_path / "results.csv")
+    test_system.export_dynamic_results(filepath, variables, chunk_size=7)
+    res = test_system.read_results_file(filepath)
+    expected = test_system.get_all_dynamic_results(variables)
+
+    assert res.shape == expected.shape
+    assert res.loc[:, ("SM2", "fehz")].to_numpy() == pytest.approx(
+        expected.loc[:, ("SM2", "fehz")].to_numpy())
+
+
+def test_series_stats(test_system):
+    """Check the statistics of a simulated time series."""
+    variables = {"SM1.ElmSym": ["n:fehz:bus1"]}
+    test_system.prepare_dynamic_sim(variables=variables)
+    test_system.run_dynamic_sim()
+    stats = test_system.series_stats("SM1.ElmSym", "n:fehz:bus1")
+
+    assert stats["mean"] == pytest.approx(50.0, abs=0.01)
+    assert stats["rms"] == pytest.approx(50.0, abs=0.01)
+    assert stats["max"] >= stats["mean"]
+
+
 def test_check_islands(test_system):
     """ Check if the isalnds can be detected correctly. """
     test_system.create_switch_event(test_system.lines["Line12"], 1.0)
@@ -108,6 +163,20 @@ def test_delete_switch_evemt(test_system):
     assert res.iloc[30, :].to_numpy()[0] > 0.05
 
 
+def test_create_trip_line_event(test_system):
+    """Check if a line can be tripped at both ends."""
+    target_name = "Line12"
+    monitor = {"Line12.ElmLne": ["m:I:bus1"]}
+
+    test_system.create_trip_line_event(target_name, 0.1)
+    test_system.prepare_dynamic_sim(variables=monitor)
+    test_system.run_dynamic_sim()
+    res = test_system.get_results(monitor)
+    test_system.delete_trip_line_event(target_name)
+
+    assert res.iloc[30, :].to_numpy()[0] == pytest.approx(0.0, abs=0.01)
+
+
 def test_get_output_window_content(test_system):
     """Test if the output window data is given."""
 
@@ -186,6 +255,25 @@ def test_get_total_gen(test_system):
     """Check if we can get the total production correctly."""
     assert test_system.get_total_gen() == 25
 
+
+def test_get_area_totals(test_system):
+    """Check if the area totals add up to the system totals."""
+    assert test_system.get_area_loads().sum() == pytest.approx(
+        test_system.get_total_load())
+    assert test_system.get_area_gens().sum() == pytest.approx(
+        test_system.get_total_gen())
+
+
+def test_check_if_in_service(test_system):
+    """Check if the service status of a machine is read correctly."""
+    assert test_system.check_if_in_service("SM1")
+    test_system.gens["SM1"].in_service = False
+    try:
+        assert not test_system.check_if_in_service("SM1")
+    finally:
+        test_system.gens["SM1"].in_service = True
+
+
 def test_change_os(test_system):
     """Check if we can correctly initialise a grid from a pandas Series."""
     index_l = pd.MultiIndex.from_product([["loads"], ["General Load"],
@@ -197,3 +285,17 @@ def test_change_os(test_system):
 
     assert test_system.loads["General Load"].p_set == 100
     assert test_system.gens["SM1"].p_set == 50
+
+
+def test_set_load_powers(test_system):
+    """Check if we can set the power of loads from dictionaries."""
+    name = "General Load"
+    old_p = test_system.loads[name].p_set
+    old_q = test_system.loads[name].q_set
+
+    test_system.set_load_powers({name: 20.0}, {name: 5.0})
+
+    assert test_system.loads[name].p_set == 20
+    assert test_system.loads[name].q_set == 5
+
+    test_system.set_load_powers({name: old_p}, {name: old_q})